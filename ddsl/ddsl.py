@@ -1,12 +1,51 @@
+import warnings
+
 import torch
 import torch.nn as nn
 from torch.autograd import Function
 from torch.autograd.function import once_differentiable
 from math import pi
 
-from utils import fftfreqs, simplex_content, permute_seq, coalesce_update, img, construct_B_batch, batch_adjugate
+from utils import fftfreqs, simplex_content_batch, permute_seq, coalesce_update, img, construct_B_batch, batch_adjugate
 from math import ceil, factorial
 
+@torch.jit.script
+def _ft_denom(sig, j: int):
+    """
+    Denominator product prod_{d != dim}(sig_dim - sig_d), unrolled for the
+    simplex degrees used in practice (j = 1, 2, 3).
+    :param sig: per-vertex phase tensor of shape (elem_batch, j+1, dimX, dimY, dimZ, 1, 1)
+    :param j: dimension of simplex set
+    :return: denom of the same shape as sig
+    """
+    if j == 1:
+        return sig - sig[:, [1, 0]]
+    elif j == 2:
+        return (sig - sig[:, [1, 2, 0]]) * (sig - sig[:, [2, 0, 1]])
+    elif j == 3:
+        return (sig - sig[:, [1, 2, 3, 0]]) * (sig - sig[:, [2, 3, 0, 1]]) * (sig - sig[:, [3, 0, 1, 2]])
+    denom = torch.ones_like(sig)
+    for dim in range(1, j+1):
+        seq = list(range(dim, j+1)) + list(range(0, dim))
+        denom = denom * (sig - sig[:, seq])
+    return denom
+
+@torch.jit.script
+def _simplex_ft_batch(sig, CDi, j: int):
+    """
+    JIT-compiled kernel evaluating the simplex FT for one batch of elements.
+    :param sig: per-vertex phase tensor of shape (elem_batch, j+1, dimX, dimY, dimZ)
+    :param CDi: content-weighted density tensor of shape (elem_batch, n_channel)
+    :param j: dimension of simplex set
+    :return: Fi of shape (dimX, dimY, dimZ, n_channel, 2)
+    """
+    sig = torch.unsqueeze(sig, dim=-1) # [elem_batch, j+1, dimX, dimY, dimZ, 1]
+    esig = torch.stack((torch.cos(sig), -torch.sin(sig)), dim=-1) # [elem_batch, j+1, dimX, dimY, dimZ, 1, 2]
+    sig = torch.unsqueeze(sig, dim=-1) # [elem_batch, j+1, dimX, dimY, dimZ, 1, 1]
+    denom = _ft_denom(sig, j) # [elem_batch, j+1, dimX, dimY, dimZ, 1, 1]
+    tmp = torch.sum(esig / denom, dim=1).squeeze(-2) # [elem_batch, dimX, dimY, dimZ, 2]
+    return torch.einsum('b...i,bc->...ci', tmp, CDi) # [dimX, dimY, dimZ, n_channel, 2]
+
 class SimplexFT(Function):
     """
     Fourier transform for signal defined on a j-simplex set in R^n space
@@ -45,8 +84,11 @@ class SimplexFT(Function):
         ctx.elem_batch = elem_batch
         ctx.subdim = subdim
         
+        # compute element-point tensor, shared by content and FT computation
+        P = V[E] # [n_elem, j+1, d]
+
         # compute content array
-        C = factorial(j) * simplex_content(V, E, signed=subdim) # [n_elem, 1]
+        C = factorial(j) * simplex_content_batch(P, signed=subdim) # [n_elem, 1]
         ctx.save_for_backward(V, E, D, C)
 
         ## compute frequencies F
@@ -58,45 +100,36 @@ class SimplexFT(Function):
         # frequency tensor
         omega = fftfreqs(res, dtype=V.dtype).to(V.device) # [dim0, dim1, dim2, d]
 
-        # normalize frequencies
-        for dim in range(n_dims):
-            omega[..., dim] *= 2 * pi / t[dim]
+        # normalize frequencies (out of place, fftfreqs returns a cached tensor)
+        omega = omega * (2 * pi / omega.new_tensor(t))
 
         # initialize output F
         F_shape = list(omega.shape)[:-1]
         F_shape += [n_channel, 2]
         F = torch.zeros(*F_shape, dtype=V.dtype, device=V.device) # [dimX, dimY, dimZ, n_chan, 2] 2: real/imag
 
-        # compute element-point tensor
-        P = V[E] # [n_elem, j+1, d]
+        # precompute content-weighted densities once for all batches
+        CD = C.expand_as(D) * D # [n_elem, n_channel]
+
+        # phases per vertex via a single GEMM over all vertices, gathered per
+        # element, so vertices shared between elements are computed once.
+        # Fall back to the per-batch einsum when the full phase tensor would
+        # exceed what elem_batch is meant to bound.
+        share_sig = n_vert <= elem_batch * (j+1)
+        if share_sig:
+            sig_v = torch.einsum('vd,...d->v...', (V, omega)) # [n_vert, dimX, dimY, dimZ]
 
         # loop over element batches
         for idx in range(ceil(n_elem/elem_batch)):
             id_start = idx * elem_batch
             id_end = min((idx+1) * elem_batch, n_elem)
-            Xi = P[id_start:id_end] # [elem_batch, j+1, d]
-            Di = D[id_start:id_end] # [elem_batch, n_channel]
-            Ci = C[id_start:id_end] # [elem_batch, 1]
-            CDi = Ci.expand_as(Di) * Di # [elem_batch, n_channel]
-            sig = torch.einsum('bjd,...d->bj...', (Xi, omega)) 
-            sig = torch.unsqueeze(sig, dim=-1) # [elem_batch, j+1, dimX, dimY, dimZ, 1]
-            esig = torch.stack((torch.cos(sig), -torch.sin(sig)), dim=-1) # [elem_batch, j+1, dimX, dimY, dimZ, 1, 2]
-            sig = torch.unsqueeze(sig, dim=-1) # [elem_batch, j+1, dimX, dimY, dimZ, 1, 1]
-            denom = torch.ones_like(sig) # [elem_batch, j+1, dimX, dimY, dimZ, 1, 1]
-            for dim in range(1, j+1):
-                seq = permute_seq(dim, j+1)
-                denom *= sig - sig[:, seq]
-            tmp = torch.sum(esig / denom, dim=1) # [elem_batch, dimX, dimY, dimZ, 1, 2]
-            CDi.unsqueeze_(-1) # [elem_batch, n_channel, 1]
-            for _ in range(n_dims): # unsqueeze to broadcast
-                CDi.unsqueeze_(dim=1) # [elem_batch, 1, 1, 1, n_channel, 2]
-            shape_ = (list(tmp.shape[:-2])+[n_channel, 2])
-            tmp = tmp * CDi # [elem_batch, dimX, dimY, dimZ, n_channel, 2]
-            Fi = torch.sum(tmp, dim=0, keepdim=False) # [dimX, dimY, dimZ, n_channel, 2]
-            CDi_ = torch.sum(CDi, dim=0)
-            for _ in range(n_dims): # squeeze dims
-                CDi_.squeeze_(dim=0) # [n_channel, 2]
-            Fi[tuple([0] * n_dims)] = - 1 / factorial(j) * CDi_
+            CDi = CD[id_start:id_end] # [elem_batch, n_channel]
+            if share_sig:
+                sig = sig_v[E[id_start:id_end]] # [elem_batch, j+1, dimX, dimY, dimZ]
+            else:
+                sig = torch.einsum('bjd,...d->bj...', (P[id_start:id_end], omega))
+            Fi = _simplex_ft_batch(sig, CDi, j) # [dimX, dimY, dimZ, n_channel, 2]
+            Fi[tuple([0] * n_dims)] = - 1 / factorial(j) * torch.sum(CDi, dim=0).unsqueeze(-1)
             F += Fi
 
         F = img(F, deg=j) # Fi *= 1j**j [dimX, dimY, dimZ, n_chan, 2] 2: real/imag
@@ -136,12 +169,8 @@ class SimplexFT(Function):
             # frequency tensor
             omega = fftfreqs(res, dtype=V.dtype).to(V.device) # [dim0, dim1, dim2, d]
 
-            # normalize frequencies
-            for dim in range(n_dims):
-                omega[..., dim] *= 2 * pi / t[dim]
-
-            # compute element-point tensor
-            P = V[E] # [n_elem, j+1, d]
+            # normalize frequencies (out of place, fftfreqs returns a cached tensor)
+            omega = omega * (2 * pi / omega.new_tensor(t))
 
             # initialize output dV
             dV = torch.zeros_like(V) if ctx.needs_input_grad[0] else None # [j+1, n_dims]
@@ -153,6 +182,12 @@ class SimplexFT(Function):
             # helper functions
             seq = lambda i : permute_seq(i, j+1) # return looped sequences
 
+            # phases per vertex via a single GEMM, gathered per element
+            # (see forward for the fallback rationale)
+            share_sig = n_vert <= elem_batch * (j+1)
+            if share_sig:
+                sig_v = torch.einsum('vd,...d->v...', (V, omega)) # [n_vert, dimX, dimY, dimZ]
+
             # loop over element batches
             for idx in range(ceil(n_elem/elem_batch)):
                 id_start = idx * elem_batch
@@ -162,13 +197,14 @@ class SimplexFT(Function):
                 Di = D[id_start:id_end] # [elem_batch, n_channel]
                 Ci = C[id_start:id_end] # [elem_batch, 1]
                 Ei = E[id_start:id_end] # [elem_batch, j+1]
-                sig = torch.einsum('bjd,...d->bj...', (Xi, omega)) 
+                if share_sig:
+                    sig = sig_v[Ei] # [elem_batch, j+1, dimX, dimY, dimZ]
+                else:
+                    sig = torch.einsum('bjd,...d->bj...', (Xi, omega))
                 sig = torch.unsqueeze(sig, dim=-1) # [elem_batch, j+1, dimX, dimY, dimZ, 1]
                 esig = torch.stack((torch.cos(sig), -torch.sin(sig)), dim=-1) # [elem_batch, j+1, dimX, dimY, dimZ, 1, 2]
                 sig = torch.unsqueeze(sig, dim=-1) # [elem_batch, j+1, dimX, dimY, dimZ, 1, 1]
-                denom = torch.ones_like(sig) # [elem_batch, j+1, dimX, dimY, dimZ, 1, 1]
-                for dim in range(1, j+1):
-                    denom *= sig - sig[:, seq(dim)]
+                denom = _ft_denom(sig, j) # [elem_batch, j+1, dimX, dimY, dimZ, 1, 1]
                 Si = esig / denom # [elem_batch, j+1, dimX, dimY, dimZ, 1, 2]
 
                 # reduce S over each element and multiply by imag and dF
@@ -286,12 +322,14 @@ class DDSL_phys(nn.Module):
         self.j = j
         self.elem_batch = elem_batch
         self.mode = mode
-        self.filter = None
         self.sig = sig
+        filter_ = None
         if isinstance(smoothing, str):
             assert(smoothing in ["gaussian"])
             if smoothing == 'gaussian':
-                self.filter = self._gaussian_filter()
+                filter_ = self._gaussian_filter()
+        # register as buffer so .to()/.cuda() moves it with the module
+        self.register_buffer('filter', filter_)
     def forward(self, V, E, D):
         """
         :param V: vertex tensor. float tensor of shape (n_vertex, n_dims)
@@ -304,7 +342,8 @@ class DDSL_phys(nn.Module):
         F = SimplexFT.apply(V,E,D,self.res,self.t,self.j,self.elem_batch,self.mode)
         F[torch.isnan(F)] = 0 # pad nans to 0
         if self.filter is not None:
-            self.filter = self.filter.to(F.device)
+            if self.filter.device != F.device:
+                self.filter = self.filter.to(F.device)
             F *= self.filter # [dim0, dim1, dim2, n_channel, 2]
         dim = len(self.res)
         F = F.permute(*([dim] + list(range(dim)) + [dim+1])) # [n_channel, dim0, dim1, dim2, 2]
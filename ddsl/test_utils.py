@@ -177,7 +177,7 @@ if __name__ == '__main__':
     import matplotlib as mpl; mpl.use('Agg')
     import matplotlib.pyplot as plt
     plt.rcParams.update({'font.size': 14})
-    res = np.array([4, 8, 16, 32], dtype=np.int)
+    res = np.array([4, 8, 16, 32], dtype=np.int64)
     ebatch = np.array([2000, 2000, 2000, 500, 100])
     forward_time = []
     backward_time = []
@@ -196,7 +196,7 @@ if __name__ == '__main__':
     plt.title('3D speed benchmark for tri mesh with ~1200 faces.')
     plt.savefig('speed3d.png')
 
-    res = np.array([16, 32, 64, 128, 256], dtype=np.int)
+    res = np.array([16, 32, 64, 128, 256], dtype=np.int64)
     ebatch = np.array([2000, 2000, 2000, 500, 100])
     forward_time = []
     backward_time = []
@@ -1,6 +1,7 @@
 import torch
 import numpy as np
 from math import factorial
+import functools
 import os
 
 
@@ -9,8 +10,13 @@ def fftfreqs(res, dtype=torch.float32, exact=True):
     Helper function to return frequency tensors
     :param res: n_dims int tuple of number of frequency modes
     :return:
+    Note: the returned tensor is cached and shared across calls at the
+    same resolution; treat it as read-only and do not modify in place.
     """
+    return _fftfreqs_cached(tuple(res), dtype, exact)
 
+@functools.lru_cache(maxsize=16)
+def _fftfreqs_cached(res, dtype, exact):
     n_dims = len(res)
     freqs = []
     for dim in range(n_dims - 1):
@@ -35,20 +41,7 @@ def construct_B(V, E):
     :param E: element tensor. int tensor of shape (n_elem, j+1)
     :return: B: B matrix of shape (n_elem, j+2, j+2)
     """
-    ne = E.shape[0]
-    j = E.shape[1]-1
-    P = V[E]
-    
-    B = torch.zeros(ne, j+2, j+2, device=V.device, dtype=V.dtype)
-    B[:, :, 0] = 1
-    B[:, 0, :] = 1
-    for r in range(1, j+2):
-        for c in range(r+1, j+2):
-            B[:, r, c] = torch.sum((P[:, r-1] - P[:, c-1]) ** 2, dim=-1)
-            B[:, c, r] = B[:, r, c]
-    B[:, 0, 0] = 0
-    
-    return B
+    return construct_B_batch(V[E])
 
 def construct_B_batch(P):
     """
@@ -58,16 +51,14 @@ def construct_B_batch(P):
     """
     ne = P.shape[0]
     j = P.shape[1]-1
-    
+
     B = torch.zeros(ne, j+2, j+2, device=P.device, dtype=P.dtype)
     B[:, :, 0] = 1
     B[:, 0, :] = 1
-    for r in range(1, j+2):
-        for c in range(r+1, j+2):
-            B[:, r, c] = torch.sum((P[:, r-1] - P[:, c-1]) ** 2, dim=-1)
-            B[:, c, r] = B[:, r, c]
     B[:, 0, 0] = 0
-    
+    # batched pairwise squared distances fill the lower-right block at once
+    B[:, 1:, 1:] = torch.sum((P.unsqueeze(2) - P.unsqueeze(1)) ** 2, dim=-1)
+
     return B
 
 def simplex_content(V, E, signed=False):
@@ -78,14 +69,21 @@ def simplex_content(V, E, signed=False):
     :param signed: bool denoting whether to calculate signed content or unsigned content
     :return: vol: volume of the simplex
     """
-    ne = E.shape[0]
-    nd = V.shape[1]
-    j = E.shape[1]-1
-    P = V[E]
+    return simplex_content_batch(V[E], signed=signed)
+
+def simplex_content_batch(P, signed=False):
+    """
+    Compute the content of simplices from the element-point tensor P (i.e., V[E])
+    :param P: point tensor. float tensor of shape (n_elem, j+1, n_dims)
+    :param signed: bool denoting whether to calculate signed content or unsigned content
+    :return: vol: volume of the simplex
+    """
+    nd = P.shape[2]
+    j = P.shape[1]-1
     if not signed:
-        B = construct_B(V, E) # construct Cayley-Menger matrix
+        B = construct_B_batch(P) # construct Cayley-Menger matrix
         vol2 = (-1)**(j+1) / (2**j) / (factorial(j)**2) * batch_det(B)
-        neg_mask = torch.sum(vol2 < 0)
+        neg_mask = vol2 < 0
         if torch.sum(neg_mask) > 0:
             vol2[neg_mask] = 0
             print("[!]Warning: zeroing {0} small negative number".format(torch.sum(neg_mask).item()))
@@ -27,12 +27,14 @@ def plot_airfoil(f, name):
     ax1.set_title(name)
     return fig
 
-def construct_VED(airfoil, device, grad):
+def construct_VED(airfoil, device, grad, jitter=True):
     '''
     Constructs V, E, and D tensors for DDSL.
     :param airfoil: name of airfoil
     :param device: name of device to be used (e.g., 'cuda', 'cpu')
     :param grad: sets requires_grad for V to True or False
+    :param jitter: perturb vertices slightly to avoid divide by zero;
+                   skip when the shape is known to be in generic position
     '''
     assert isinstance(airfoil, str)
     
@@ -58,7 +60,8 @@ def construct_VED(airfoil, device, grad):
             V.append(k)
     
     V=torch.tensor(V, dtype=float_type)
-    V += eps * torch.rand_like(V) # add noise to avoid divide by zero
+    if jitter:
+        V = V + eps * torch.rand_like(V) # add noise (out of place) to avoid divide by zero
     
     # Position airfoil in center
     V=0.9*V
@@ -85,7 +88,7 @@ def construct_VED(airfoil, device, grad):
     
     return V, E, D
 
-def airfoil_spec(airfoil, res, t=(1,1), save_name=None, device='cuda', grad=True):
+def airfoil_spec(airfoil, res, t=(1,1), save_name=None, device='cuda', grad=True, jitter=True):
     '''
     Performs DDSL transformation on airfoil polygon into the spectral domain.
     :param airfoil: name of airfoil.
@@ -93,9 +96,10 @@ def airfoil_spec(airfoil, res, t=(1,1), save_name=None, device='cuda', grad=True
     :param t: n_dims tuple of period in each dimension
     :param device: name of device to be used (e.g., 'cuda', 'cpu')
     :param grad: sets requires_grad for V to True or False
+    :param jitter: perturb vertices slightly to avoid divide by zero
     '''
     # Construct V, E, and D
-    V, E, D = construct_VED(airfoil, device, grad)
+    V, E, D = construct_VED(airfoil, device, grad, jitter)
     
     # NUFT of airfoil
     ddsl_spec=DDSL_spec(res,t,2,1)
@@ -107,7 +111,7 @@ def airfoil_spec(airfoil, res, t=(1,1), save_name=None, device='cuda', grad=True
 
     return F
 
-def airfoil_phys(airfoil, res, t=(1,1), save_name=None, device='cuda', grad=True):
+def airfoil_phys(airfoil, res, t=(1,1), save_name=None, device='cuda', grad=True, jitter=True):
     '''
     Performs DDSL transformation on airfoil polygon into the physical domain.
     :param airfoil: name of airfoil.
@@ -115,9 +119,10 @@ def airfoil_phys(airfoil, res, t=(1,1), save_name=None, device='cuda', grad=True
     :param t: n_dims tuple of period in each dimension
     :param device: name of device to be used (e.g., 'cuda', 'cpu')
     :param grad: sets requires_grad for V to True or False
+    :param jitter: perturb vertices slightly to avoid divide by zero
     '''
     # Construct V, E, and D
-    V, E, D = construct_VED(airfoil, device, grad)
+    V, E, D = construct_VED(airfoil, device, grad, jitter)
     
     # NUFT of airfoil + irfft
     ddsl_phys=DDSL_phys(res,t,2,1)
@@ -44,27 +44,55 @@ class AirfoilDataset(Dataset):
             idx=idx_arr[num_train:num_train+num_test]
         elif set_type=='valid':
             idx=idx_arr[num_train+num_test:]
-        self.airfoil_df=df.iloc[idx]
-        
+        airfoil_df=df.iloc[idx]
+
+        # Extract columns once; indexing these in __getitem__ avoids
+        # per-sample pandas .iloc dispatch and keeps the dataframe itself
+        # out of the DataLoader worker pickles. The numeric columns live in
+        # torch shared memory so forked workers read the parent's buffers
+        # instead of each receiving a pickled copy. Name/Directory are
+        # string arrays and stay in numpy.
+        self.names=airfoil_df['Name'].to_numpy()
+        self.Re=torch.from_numpy(airfoil_df['Re'].to_numpy(np.float32)).share_memory_()
+        self.Cl=torch.from_numpy(airfoil_df['Cl'].to_numpy(np.float32)).share_memory_()
+        self.Cd=torch.from_numpy(airfoil_df['Cd'].to_numpy(np.float32)).share_memory_()
+        self.ClCd=torch.from_numpy(airfoil_df['Cl/Cd'].to_numpy(np.float32)).share_memory_()
+        self.aoa=torch.from_numpy(airfoil_df['AoA'].to_numpy(np.float32)).share_memory_()
+        self.dirs=airfoil_df['Directory'].to_numpy()
+
         self.shape_dir=shape_dir
-        
+
+        # Resolve shape file paths once, keeping string work out of
+        # __getitem__ (prefer pre-converted float32 .npy files,
+        # see process_airfoil_shapes_npy.py)
+        shape_files=[]
+        for af_dir in self.dirs:
+            npy_file=shape_dir+'/'+af_dir+'.npy'
+            if os.path.exists(npy_file):
+                shape_files.append(npy_file)
+            else:
+                shape_files.append(shape_dir+'/'+af_dir+'.pt')
+        self.shape_files=np.asarray(shape_files)
+
     def __len__(self):
-        return len(self.airfoil_df)
-    
-    def __getitem__(self, idx):    
-        # Get CFD info from dataframe
-        name=self.airfoil_df['Name'].iloc[idx]
-        Re=self.airfoil_df['Re'].iloc[idx]
-        Cl=self.airfoil_df['Cl'].iloc[idx]
-        Cd=self.airfoil_df['Cd'].iloc[idx]
-        ClCd=self.airfoil_df['Cl/Cd'].iloc[idx]
-        aoa=self.airfoil_df['AoA'].iloc[idx]
-        
-        # Get numpy shape file
-        af_dir=self.airfoil_df['Directory'].iloc[idx]
-        shape_dir=self.shape_dir
-        shape_file=shape_dir+'/'+af_dir+'.pt'
-        shape=torch.load(shape_file)
+        return len(self.names)
+
+    def __getitem__(self, idx):
+        # Get CFD info
+        name=self.names[idx]
+        Re=self.Re[idx]
+        Cl=self.Cl[idx]
+        Cd=self.Cd[idx]
+        ClCd=self.ClCd[idx]
+        aoa=self.aoa[idx]
+
+        # Get shape file
+        shape_file=self.shape_files[idx]
+        if shape_file.endswith('.npy'):
+            shape=np.load(shape_file, mmap_mode='r')
+            shape=torch.from_numpy(np.ascontiguousarray(shape))
+        else:
+            shape=torch.load(shape_file).float()
           
         # Create dictionary output
         sample={'name': name,\
@@ -74,5 +102,23 @@ class AirfoilDataset(Dataset):
                 'Cd': Cd,\
                 'Cl/Cd': ClCd,\
                 'aoa': aoa}
-        
-        return sample
\ No newline at end of file
+
+        return sample
+
+def make_airfoil_loader(dataset, batch_size=64, num_workers=None, shuffle=True):
+    '''
+    Wrap an AirfoilDataset in a DataLoader configured for this
+    preprocessing-heavy dataset: persistent workers keep per-worker state
+    alive across epochs, pinned memory enables async host-to-device copies,
+    and a small prefetch keeps the GPU fed.
+    params:
+        dataset (AirfoilDataset): dataset to wrap.
+        batch_size (int): samples per batch.
+        num_workers (int): worker processes; defaults to half the CPUs.
+        shuffle (bool): shuffle samples each epoch.
+    '''
+    if num_workers is None:
+        num_workers=max(os.cpu_count()//2, 1)
+    kwargs={'persistent_workers': True, 'prefetch_factor': 2} if num_workers>0 else {}
+    return DataLoader(dataset, batch_size=batch_size, shuffle=shuffle,\
+                      num_workers=num_workers, pin_memory=True, **kwargs)
\ No newline at end of file
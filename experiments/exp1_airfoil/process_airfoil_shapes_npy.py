@@ -0,0 +1,26 @@
+import os
+import time
+import numpy as np
+import torch
+
+print('Now converting airfoil shapes to float32 .npy...')
+
+# Convert all processed .pt shape files in processed_data
+directory='processed_data'
+i=0
+start=time.time()
+for fname in sorted(os.listdir(directory)):
+    if not fname.endswith('.pt'):
+        continue
+    save_file=os.path.join(directory, fname[:-3]+'.npy')
+    if not os.path.exists(save_file):
+        shape=torch.load(os.path.join(directory, fname))
+        np.save(save_file, shape.detach().cpu().numpy().astype(np.float32))
+    i=i+1
+
+    if (i+1)%100==0:
+        end=time.time()
+        print(str(i+1)+' airfoil shapes converted! Time elapsed: '+str(end-start))
+        start=time.time()
+
+print('Conversion complete!')
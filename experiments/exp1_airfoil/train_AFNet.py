@@ -88,17 +88,17 @@ def main():
 
     # Create datasets and dataloaders
     print('\nLoading data...')
-    kwargs = {'num_workers': 12, 'pin_memory': True} if use_cuda else {}
+    num_workers = 12 if use_cuda else 0
     trainset = AirfoilDataset(csv_file=args.data_file, shape_dir=args.shape_dir, set_type='train')
     validset = AirfoilDataset(csv_file=args.data_file, shape_dir=args.shape_dir, set_type='valid')
-    trainloader = DataLoader(trainset, batch_size=args.batch_size, shuffle=True,**kwargs)
-    validloader = DataLoader(validset, batch_size=args.batch_size, shuffle=True, **kwargs)
+    trainloader = make_airfoil_loader(trainset, batch_size=args.batch_size, num_workers=num_workers, shuffle=True)
+    validloader = make_airfoil_loader(validset, batch_size=args.batch_size, num_workers=num_workers, shuffle=True)
     print('\nTraining on '+str(len(trainset))+' data points.')
     print('Validating on '+str(len(validset))+' data points.\n')
     
     # Get model
     net = AFNet(bottleneck=args.bottleneck, out_ch=args.out_ch)
-    net = net.double()
+    net = net.float()
     if(torch.cuda.device_count()>1):
         print('\nUsing', torch.cuda.device_count(), 'GPUs.')
         net=nn.DataParallel(net)
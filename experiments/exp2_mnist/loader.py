@@ -118,7 +118,9 @@ class PMNISTDataSet(Dataset):
         cache_file = os.path.join(self.cache_dir, 'cache_{:05d}.pkl'.format(idx))
         P = wkt.loads(self.plist[idx])
         V, E = poly2ve(P)
-        V += 1e-6*np.random.rand(*V.shape)
+        # deterministic per-sample perturbation so cached rasters are reproducible
+        rng = np.random.default_rng(idx)
+        V = V + 1e-6*rng.random(V.shape)
         V=torch.tensor(V, dtype=torch.float64, requires_grad=False)
         E=torch.LongTensor(E)
         D = torch.ones(E.shape[0], 1, dtype=torch.float64)
@@ -31,7 +31,7 @@ class CityScapeLoader(Dataset):
         dat = np.load(self.filelist[idx])
         target_ = [dat[t].T for t in targets] if self.transpose else [dat[t] for t in targets]
         input = PIL.Image.fromarray(np.moveaxis(dat['image'], 0, -1))       
-        label = dat['label_id'].astype(np.int)
+        label = dat['label_id'].astype(np.int64)
 
         # flip horizontal
         if np.random.rand() < self.RandomHorizontalFlip:
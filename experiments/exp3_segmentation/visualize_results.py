@@ -130,7 +130,7 @@ class visualizer(object):
         sps = [d['starting_point'] for d in instance_dicts]
         
         for i, (p, w, sp) in enumerate(zip(polygons, widths, sps)):
-            poly = (p*w).astype(np.int)
+            poly = (p*w).astype(np.int64)
             poly[:, 0] += sp[0]
             poly[:, 1] += sp[1]
             polygons[i] = poly
@@ -1,11 +1,10 @@
 import torch
 import torchvision
-from torch.utils.data import Dataset
+from torch.utils.data import Dataset, DataLoader
 import torchvision.transforms.functional as F
 from glob import glob
 import os
 import numpy as np
-from skimage import io, transform
 import trimesh
 from trimesh import sample
 import cv2
@@ -37,25 +36,60 @@ class ShapeNetLoader(Dataset):
     self.rasterlist = [os.path.join(d, 'raster_32.npy') for d in self.dirlist]
     self.meshlist = [os.path.join(d, 'model.off') for d in self.dirlist]
     self.imlist = [os.path.join(d, 'img_choy2016') for d in self.dirlist]
+    self.pool_size = max(10 * npts, 20000)
+    self.poollist = [os.path.join(d, 'pts_{}.npy'.format(self.pool_size)) for d in self.dirlist]
 
   def __len__(self):
     return len(self.dirlist)
 
+  def _sample_pool(self, idx):
+    """Sample a pool of surface points once and cache it next to the mesh,
+    so OFF parsing and surface sampling stay out of the per-epoch path.
+    """
+    mesh0 = trimesh.load(self.meshlist[idx])
+    vertices = torch.tensor(mesh0.vertices)
+    vertices = normalize_V(vertices).numpy()
+    mesh = trimesh.Trimesh(vertices, mesh0.faces)
+    pool = sample.sample_surface(mesh, self.pool_size)[0].astype(np.float32)
+    np.save(self.poollist[idx], pool)
+    return pool
+
   def __getitem__(self, idx):
     """Returns tuples of (one random image, raster, surface point samples)
     """
     # load one random image
     s = '{:03d}.jpg'.format(np.random.choice(24))
     img = cv2.imread(os.path.join(self.imlist[idx], s))
-    img = transform.resize(img, self.imsize)
-    raster = np.load(self.rasterlist[idx])
-    mesh0 = trimesh.load(self.meshlist[idx])
-    vertices = torch.tensor(mesh0.vertices)
-    vertices = normalize_V(vertices).numpy()
-    mesh = trimesh.Trimesh(vertices, mesh0.faces)
-    pts = sample.sample_surface(mesh, self.npts)[0]
+    img = cv2.resize(img, (self.imsize[1], self.imsize[0]), interpolation=cv2.INTER_AREA)
+    img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB).astype(np.float32) / 255.0
+    # mmap so warm epochs are served from the OS page cache shared across workers
+    raster = np.load(self.rasterlist[idx], mmap_mode='r')
+    # draw surface points from the cached pool, sampling it on first access
+    if os.path.exists(self.poollist[idx]):
+      pool = np.load(self.poollist[idx], mmap_mode='r')
+    else:
+      pool = self._sample_pool(idx)
+    pidx = np.random.choice(self.pool_size, self.npts, replace=False)
+    pts = np.asarray(pool[pidx])
 
-    img = torch.tensor(img).permute(2,0,1).type(torch.float32)
-    raster = torch.tensor(raster).float()
-    pts = torch.tensor(pts).float()
+    # build tensors over the numpy buffers instead of copying
+    img = torch.from_numpy(np.ascontiguousarray(img.transpose(2,0,1)))
+    raster = torch.from_numpy(np.array(raster, dtype=np.float32)) # writable copy off the mmap
+    pts = torch.from_numpy(pts).float()
     return img, raster, pts
+
+
+def make_shapenet_loader(dataset, batch_size, num_workers=None, shuffle=None, drop_last=False):
+  """Wrap a ShapeNetLoader in a DataLoader configured for this
+  preprocessing-heavy dataset: persistent workers keep per-worker state
+  alive across epochs, pinned memory enables async host-to-device copies,
+  and a small prefetch keeps the GPU fed. shuffle defaults to True for the
+  train partition.
+  """
+  if num_workers is None:
+    num_workers = max(os.cpu_count() // 2, 1)
+  if shuffle is None:
+    shuffle = dataset.partition == 'train'
+  kwargs = {'persistent_workers': True, 'prefetch_factor': 2} if num_workers > 0 else {}
+  return DataLoader(dataset, batch_size=batch_size, shuffle=shuffle, drop_last=drop_last,
+                    num_workers=num_workers, pin_memory=True, **kwargs)
@@ -10,7 +10,7 @@ import shutil, argparse, logging, sys, time, os, pickle, trimesh
 from tensorboardX import SummaryWriter
 from collections import OrderedDict
 
-from loader import ShapeNetLoader
+from loader import ShapeNetLoader, make_shapenet_loader
 from model import SphereNet, SphereNet2, BatchedRasterLoss3D, ChamferLoss, MeshSampler, LaplacianLoss, EdgeLoss
 
 torch.backends.cudnn.benchmark=True
@@ -347,8 +347,8 @@ def main():
     args.img_std = torch.tensor([0.229, 0.224, 0.225]).view(-1, 1, 1).to(device)
     
 
-    train_loader = DataLoader(trainset, batch_size=args.batch_size, shuffle=True, drop_last=True, num_workers=args.workers, pin_memory=True)
-    val_loader = DataLoader(valset, batch_size=args.batch_size, shuffle=True, drop_last=False, num_workers=args.workers, pin_memory=True)
+    train_loader = make_shapenet_loader(trainset, batch_size=args.batch_size, num_workers=args.workers, shuffle=True, drop_last=True)
+    val_loader = make_shapenet_loader(valset, batch_size=args.batch_size, num_workers=args.workers, shuffle=True, drop_last=False)
 
     # create log dir to save mesh
     args.meshsamp_dir = os.path.join(args.log_dir, "mesh_samples")